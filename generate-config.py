@@ -10,6 +10,37 @@ from typing import Dict, List
 
 import yaml
 
+try:
+    # libyaml-backed loader when PyYAML was built with it
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+
+# Environment variable -> [serverconfig.json key, value type]
+_ENV_SETTING_MAP = {
+    "VS_CFG_SERVER_NAME": ["ServerName", "string"],
+    "VS_CFG_SERVER_URL": ["ServerUrl", "string"],
+    "VS_CFG_SERVER_DESCRIPTION": ["ServerDescription", "string"],
+    "VS_CFG_WELCOME_MESSAGE": ["WelcomeMessage", "string"],
+    "VS_CFG_ALLOW_CREATIVE_MODE": ["AllowCreativeMode", "boolean"],
+    "VS_CFG_SERVER_IP": ["Ip", "string"],
+    "VS_CFG_SERVER_PORT": ["Port", "integer"],
+    "VS_CFG_SERVER_UPNP": ["Upnp", "boolean"],
+    "VS_CFG_SERVER_COMPRESS_PACKETS": ["CompressPackets", "boolean"],
+    "VS_CFG_ADVERTISE_SERVER": ["AdvertiseServer", "boolean"],
+    "VS_CFG_MAX_CLIENTS": ["MaxClients", "integer"],
+    "VS_CFG_PASS_TIME_WHEN_EMPTY": ["PassTimeWhenEmpty", "boolean"],
+    "VS_CFG_SERVER_PASSWORD": ["Password", "string"],
+    "VS_CFG_MAX_CHUNK_RADIUS": ["MaxChunkRadius", "integer"],
+    "VS_CFG_SERVER_LANGUAGE": ["ServerLanguage", "string"],
+    "VS_CFG_ENFORCE_WHITELIST": ["WhitelistMode", "bitwise"],
+    "VS_CFG_ANTIABUSE": ["AntiAbuse", "bitwise"],
+    "VS_CFG_ALLOW_PVP": ["AllowPvP", "boolean"],
+    "VS_CFG_HOSTED_MODE": ["HostedMode", "boolean"],
+    "VS_CFG_HOSTED_MODE_ALLOW_MODS": ["HostedModeAllowMods", "boolean"],
+}
+
 
 class VintageStoryConfig:
     """Class to hold Vintage Story server configuration."""
@@ -19,38 +50,20 @@ class VintageStoryConfig:
         """Initialize configuration with defaults and load from file if exists."""
         self.config_json_path = None
         self.default_config_yaml_path = Path(os.getenv("HOMEPATH", "/vintagestory")) / "server-config.yaml"
-        self.env_setting_map = {
-            "VS_CFG_SERVER_NAME": ["ServerName", "string"],
-            "VS_CFG_SERVER_URL": ["ServerUrl", "string"],
-            "VS_CFG_SERVER_DESCRIPTION": ["ServerDescription", "string"],
-            "VS_CFG_WELCOME_MESSAGE": ["WelcomeMessage", "string"],
-            "VS_CFG_ALLOW_CREATIVE_MODE": ["AllowCreativeMode", "boolean"],
-            "VS_CFG_SERVER_IP": ["Ip", "string"],
-            "VS_CFG_SERVER_PORT": ["Port", "integer"],
-            "VS_CFG_SERVER_UPNP": ["Upnp", "boolean"],
-            "VS_CFG_SERVER_COMPRESS_PACKETS": ["CompressPackets", "boolean"],
-            "VS_CFG_ADVERTISE_SERVER": ["AdvertiseServer", "boolean"],
-            "VS_CFG_MAX_CLIENTS": ["MaxClients", "integer"],
-            "VS_CFG_PASS_TIME_WHEN_EMPTY": ["PassTimeWhenEmpty", "boolean"],
-            "VS_CFG_SERVER_PASSWORD": ["Password", "string"],
-            "VS_CFG_MAX_CHUNK_RADIUS": ["MaxChunkRadius", "integer"],
-            "VS_CFG_SERVER_LANGUAGE": ["ServerLanguage", "string"],
-            "VS_CFG_ENFORCE_WHITELIST": ["WhitelistMode", "bitwise"],
-            "VS_CFG_ANTIABUSE": ["AntiAbuse", "bitwise"],
-            "VS_CFG_ALLOW_PVP": ["AllowPvP", "boolean"],
-            "VS_CFG_HOSTED_MODE": ["HostedMode", "boolean"],
-            "VS_CFG_HOSTED_MODE_ALLOW_MODS": ["HostedModeAllowMods", "boolean"],
-        }
         self.config = self.load_config()
 
     def load_config(self) -> Dict[str, str]:
         """Load configuration from server-config.yaml if it exists."""
         if self.default_config_yaml_path.exists():
             with open(self.default_config_yaml_path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
+                return yaml.load(f.read(), Loader=_YamlLoader)
         else:
             return {}
 
+    def encode_config(self) -> bytes:
+        """Encode the configuration as indented UTF-8 JSON."""
+        return json.dumps(self.config, indent=2, ensure_ascii=False).encode('utf-8')
+
     @staticmethod
     def convert_value(value: str, value_type: str):
         """Convert string value from environment variable to the appropriate type."""
@@ -71,10 +84,16 @@ class VintageStoryConfig:
         
     def generate_serverconfig(self):
         """Generate config and apply overrides from environment variables."""
-        if "VS_CFG_ALLOW_CREATIVE_MODE" in os.environ:
+        # Snapshot the known settings once; the process environment is never modified
+        env = {env_key: env_value for env_key in _ENV_SETTING_MAP if (env_value := os.environ.get(env_key)) is not None}
+
+        # Creative mode lives under WorldConfig rather than the top level
+        allow_creative_mode = env.pop("VS_CFG_ALLOW_CREATIVE_MODE", None)
+        if allow_creative_mode is not None:
             print("Allowing Creative Mode")
-            self.config["WorldConfig"]["AllowCreativeMode"] = self.convert_value(os.environ.pop("VS_CFG_ALLOW_CREATIVE_MODE").lower(), "boolean")
-        overrides = {self.env_setting_map[env_key][0]: self.convert_value(os.environ[env_key], self.env_setting_map[env_key][1]) for env_key in os.environ.keys() if env_key.startswith("VS_CFG_")}
+            self.config["WorldConfig"]["AllowCreativeMode"] = self.convert_value(allow_creative_mode.lower(), "boolean")
+
+        overrides = {_ENV_SETTING_MAP[env_key][0]: self.convert_value(env_value, _ENV_SETTING_MAP[env_key][1]) for env_key, env_value in env.items()}
         self.config.update(overrides)
         if overrides:
             print("Applied the following overrides from environment variables:")
@@ -96,24 +115,32 @@ class VintageStoryConfig:
             if self.config_json_path is None:
                 raise ValueError("ERROR: Config JSON path is None.")
 
-            # Check if config already exists
-            if self.config_json_path.exists():
-                backup_path = self.config_json_path.with_suffix('.json.backup')
-                print(f"Backing up existing serverconfig.json to {backup_path}")
-                if backup_path.exists():
-                    backup_path.unlink()
-                self.config_json_path.rename(backup_path)
-
             # Generate config
             print(f"Generating serverconfig.json at {self.config_json_path}")
             self.generate_serverconfig()
 
-            # Ensure parent directory exists
-            self.config_json_path.parent.mkdir(parents=True, exist_ok=True)
+            # Encode once and hand the file a single write rather than one per chunk
+            payload = self.encode_config()
 
-            # Write config
-            with open(self.config_json_path, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
+            # Check if config already exists
+            if self.config_json_path.exists():
+                if self.config_json_path.read_bytes() == payload:
+                    # Identical config; leave the file and its backup untouched
+                    print("Existing serverconfig.json is already up to date")
+                    payload = None
+                else:
+                    backup_path = self.config_json_path.with_suffix('.json.backup')
+                    print(f"Backing up existing serverconfig.json to {backup_path}")
+                    # Atomically replaces any previous backup
+                    os.replace(self.config_json_path, backup_path)
+
+            if payload is not None:
+                # Ensure parent directory exists
+                self.config_json_path.parent.mkdir(parents=True, exist_ok=True)
+
+                # Write config
+                with open(self.config_json_path, 'wb') as f:
+                    f.write(payload)
 
             print("")
             print(f"Successfully generated serverconfig.json")
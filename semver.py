@@ -8,10 +8,38 @@ import os
 import re
 import requests
 import argparse
+import struct
 import sys
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from zipfile import ZipFile
-from typing import Tuple, List, Optional
+from zipfile import ZIP64_LIMIT, ZIP_DEFLATED, ZipFile, ZipInfo
+from typing import Iterator, Tuple, List, Optional
+
+
+# Patterns used while scanning tags and commit messages, compiled once.
+# Version tags are matched against raw git output, so that pattern is bytes.
+_VERSION_TAG_RE = re.compile(rb'^((?P<vs_version>\d+\.\d+\.\d+)-)*(?P<version>\d+\.\d+\.\d+)$')
+_BUMP_RE = re.compile(r'(?P<major>(?:feat|fix)!:)|(?P<minor>feat:)')
+
+# Coarse git-side filter for version tags; _VERSION_TAG_RE does the exact match
+VERSION_TAG_GLOB = '[0-9]*.[0-9]*.[0-9]*'
+
+# Read chunk size for streamed git output
+GIT_READ_BUFFER_SIZE = 1 << 20
+
+# Read chunk size and deflate level used when building the release zip; files
+# above ZIP_PARALLEL_MAX_SIZE are streamed instead of compressed in the thread pool
+ZIP_COPY_BUFFER_SIZE = 1 << 20
+ZIP_PARALLEL_MAX_SIZE = 1 << 20
+ZIP_COMPRESS_LEVEL = 6
+ZIP_EXCLUDED_DIRS = ('.git', '.github', 'build')
+
+# General purpose flag bit and signature for an entry's trailing data descriptor
+ZIP_DATA_DESCRIPTOR_FLAG = 0x08
+ZIP_DATA_DESCRIPTOR_SIGNATURE = 0x08074b50
 
 
 def get_distance_from_main() -> int:
@@ -20,10 +48,9 @@ def get_distance_from_main() -> int:
         result = subprocess.run(
             ['git', 'rev-list', '--count', 'main..HEAD'],
             capture_output=True,
-            text=True,
             check=True
         )
-        return int(result.stdout.strip())
+        return int(result.stdout)
     except Exception as e:
         print(f"Error getting distance from main: {e}")
         return 0
@@ -40,10 +67,9 @@ def get_current_git_hash(is_dev: bool = False) -> str:
         result = subprocess.run(
             get_hash_cmd,
             capture_output=True,
-            text=True,
             check=True
         )
-        result_hash = result.stdout.strip()
+        result_hash = result.stdout.strip().decode('ascii')
         if len(result_hash) > 7:
             git_hash = result_hash[:7]
         else:
@@ -85,103 +111,119 @@ def get_last_version() -> str:
         )
         current_branch = branch_result.stdout.strip()
 
-        # Get tags merged into current branch
+        # Get tags merged into current branch, letting git drop anything that
+        # cannot be a version tag before it reaches Python
         result = subprocess.run(
-            ['git', 'tag', '--merged', current_branch],
+            ['git', 'tag', '--merged', current_branch, '--list', VERSION_TAG_GLOB],
             capture_output=True,
-            text=True,
             check=True
         )
-        tags = result.stdout.strip().split('\n')
+        tags = result.stdout.split()
         # Filter to only semantic version tags (e.g., 1.0.0)
         version_tags = [
-            re.match(
-                r'^((?P<vs_version>\d+\.\d+\.\d+)-)*(?P<version>\d+\.\d+\.\d+)$', tag).groupdict()["version"]
-            for tag in tags if re.match(r'^((?P<vs_version>\d+\.\d+\.\d+)-)*(?P<version>\d+\.\d+\.\d+)$', tag) is not None
+            match.group('version')
+            for match in map(_VERSION_TAG_RE.match, tags) if match is not None
         ]
 
         if not version_tags:
             return '0.0.0'
 
-        # Sort by version number and return the highest
-        version_tags.sort(key=lambda v: tuple(map(int, v.split('.'))))
-        return version_tags[-1]
+        # Only the highest version is needed, so a single max() pass beats a full sort
+        return max(version_tags, key=lambda v: tuple(map(int, v.split(b'.')))).decode('ascii')
     except Exception as e:
         print(f"Error getting last version: {e}")
         return '0.0.0'
 
 
-def get_commits_since_tag(tag: str) -> List[str]:
-    """Get commit hashes since the given tag."""
+def _revision_range(tag: str) -> str:
+    """Get the revision range covering every commit since the given tag."""
+    # All commits if no tags exist, otherwise commits since the tag
+    return 'HEAD' if tag == '0.0.0' else f'{tag}..HEAD'
+
+
+def count_commits_since_tag(tag: str) -> int:
+    """Get the number of commits since the given tag."""
     try:
-        if tag == '0.0.0':
-            # Get all commits if no tags exist
-            result = subprocess.run(
-                ['git', 'rev-list', 'HEAD'],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-        else:
-            # Get commits since the tag
-            result = subprocess.run(
-                ['git', 'rev-list', f'{tag}..HEAD'],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-
-        commits = [c.strip() for c in result.stdout.strip().split('\n') if c.strip()]
-        return commits
+        result = subprocess.run(
+            ['git', 'rev-list', '--count', _revision_range(tag)],
+            capture_output=True,
+            check=True
+        )
+        return int(result.stdout)
     except Exception as e:
         print(f"Error getting commits: {e}")
-        return []
+        return 0
 
 
-def get_commit_message(commit_hash: str) -> Tuple[str, str]:
-    """Get commit subject and body."""
+def iter_commit_subjects(tag: str) -> Iterator[str]:
+    """
+    Yield the subject of every commit since the given tag, newest first.
+    Subjects are streamed from a single `git log`; closing the iterator early
+    stops git instead of waiting for the rest of the history.
+    """
+    try:
+        with subprocess.Popen(
+            ['git', 'log', '--format=%s', _revision_range(tag)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            # git log emits UTF-8 regardless of locale; one bad subject must not end the scan
+            encoding='utf-8',
+            errors='replace',
+            bufsize=GIT_READ_BUFFER_SIZE
+        ) as proc:
+            try:
+                for line in proc.stdout:
+                    yield line.rstrip('\n')
+            except GeneratorExit:
+                # The caller has what it needs; don't wait for the rest of the history
+                proc.kill()
+                raise
+        if proc.returncode != 0:
+            print(f"Error getting commit subjects: git log exited with status {proc.returncode}")
+    except Exception as e:
+        print(f"Error getting commit subjects: {e}")
+
+
+def has_breaking_change_marker(tag: str) -> bool:
+    """
+    Check whether any commit since the given tag has 'BREAKING CHANGE:' in its
+    subject or body. git searches the messages itself, so bodies never reach Python.
+    """
     try:
         result = subprocess.run(
-            ['git', 'show', '-s', '--format=%s%n%b', commit_hash],
+            ['git', 'log', '--fixed-strings', '--grep=BREAKING CHANGE:', '--max-count=1',
+             '--format=%H', _revision_range(tag)],
             capture_output=True,
-            text=True,
             check=True
         )
-        lines = result.stdout.split('\n', 1)
-        subject = lines[0] if lines else ''
-        body = lines[1] if len(lines) > 1 else ''
-        return subject, body
+        return bool(result.stdout.strip())
     except Exception as e:
-        print(f"Error getting commit message for {commit_hash}: {e}")
-        return '', ''
+        print(f"Error searching commit messages: {e}")
+        return False
 
 
-def determine_bump(commits: List[str]) -> str:
+def determine_bump(tag: str) -> str:
     """
-    Determine the semantic version bump based on commits.
+    Determine the semantic version bump based on the commits since the given tag.
     Returns 'major', 'minor', or 'patch'
     """
     has_major = False
     has_minor = False
 
-    for commit_hash in commits:
-        subject, body = get_commit_message(commit_hash)
-
-        # Check for BREAKING CHANGE in subject or body
-        if 'BREAKING CHANGE:' in subject or 'BREAKING CHANGE:' in body:
+    for subject in iter_commit_subjects(tag):
+        # One regex pass per subject: feat! or fix! is major, feat: is minor
+        match = _BUMP_RE.match(subject)
+        if match is None:
+            # fix: defaults to patch, so we don't need to explicitly check
+            continue
+        if match.lastgroup == 'major':
             has_major = True
             break
+        has_minor = True
 
-        # Check for feat! or fix! (exclamation indicates breaking change)
-        if re.match(r'^(feat|fix)!:', subject):
-            has_major = True
-            break
-
-        # Check for feat: (feature bump)
-        if re.match(r'^feat:', subject):
-            has_minor = True
-
-        # fix: defaults to patch, so we don't need to explicitly check
+    # Check for BREAKING CHANGE in any subject or body; skipped once feat!/fix! made it major
+    if not has_major and has_breaking_change_marker(tag):
+        has_major = True
 
     if has_major:
         return 'major'
@@ -209,9 +251,9 @@ def increment_version(version: str, bump: str) -> str:
     return f'{major}.{minor}.{patch}'
 
 
-def determine_new_version(current_version: str, commits: List[str]) -> Optional[str]:
-    """Determine the new version based on current version and commits."""
-    if not commits:
+def determine_new_version(current_version: str, commit_count: int) -> Optional[str]:
+    """Determine the new version based on current version and the commits since it."""
+    if not commit_count:
         print("No new commits since last version")
         print("Keeping current version:", current_version)
         return current_version
@@ -222,7 +264,7 @@ def determine_new_version(current_version: str, commits: List[str]) -> Optional[
         return '0.0.1'
 
     # Analyze commits and determine bump
-    bump = determine_bump(commits)
+    bump = determine_bump(current_version)
     new_version = increment_version(current_version, bump)
     print(f"Determined bump type: {bump}")
     return new_version
@@ -257,28 +299,174 @@ def determine_prerelease_version(base_version: str, prerelease_type: str) -> str
     return f"{base_version}-{prerelease_type}.{max_increment + 1}"
 
 
+def _iter_files(root: str) -> Iterator[os.DirEntry]:
+    """
+    Yield every file below root, skipping .git, .github and build directories.
+    Symlinked directories are not followed, matching os.walk.
+    """
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir():
+                    if not entry.is_symlink() and entry.name not in ZIP_EXCLUDED_DIRS:
+                        stack.append(entry.path)
+                else:
+                    yield entry
+
+
+def _deflate_file(file_path: str) -> Tuple[bytes, int, int]:
+    """
+    Read and raw-deflate a small file for the release zip.
+    Only used for files up to ZIP_PARALLEL_MAX_SIZE, so reading it whole is cheap.
+    Returns the compressed payload, the CRC-32 and the uncompressed size.
+    """
+    with open(file_path, 'rb') as src:
+        data = src.read()
+    compressor = zlib.compressobj(ZIP_COMPRESS_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(), zlib.crc32(data), len(data)
+
+
+def _begin_entry(zf: ZipFile, zinfo: ZipInfo, zip64: Optional[bool] = None):
+    """
+    Write an entry's local header at the end of the archive; the caller holds zf._lock.
+
+    zipfile has no public API for appending data we deflate ourselves, so this and
+    _end_entry mirror ZipFile._open_to_write and _ZipWriteFile.close (Lib/zipfile.py,
+    Lib/zipfile/__init__.py from 3.12) without the compression step. They rely on
+    ZipFile private attributes; checked against CPython 3.10 (the Docker image),
+    3.11, 3.12 and 3.13.
+    """
+    # Same guard as _open_to_write: never interleave with an open write handle
+    if zf._writing:
+        raise ValueError("Can't write to the ZIP file while there is an open writing handle")
+    # Entries are appended back to back, so the file is normally already at
+    # start_dir; a seek would only flush the write buffer for nothing
+    if zf._seekable and zf.fp.tell() != zf.start_dir:
+        zf.fp.seek(zf.start_dir)
+    zinfo.header_offset = zf.fp.tell()
+    zf._writecheck(zinfo)
+    zf._didModify = True
+    zf.fp.write(zinfo.FileHeader(zip64))
+
+
+def _end_entry(zf: ZipFile, zinfo: ZipInfo):
+    """Register an entry whose data has been written; the caller holds zf._lock."""
+    zf.filelist.append(zinfo)
+    zf.NameToInfo[zinfo.filename] = zinfo
+    zf.start_dir = zf.fp.tell()
+
+
+def _write_deflated_entry(zf: ZipFile, zinfo: ZipInfo, payload: bytes):
+    """
+    Append an entry whose data has already been deflated by _deflate_file.
+    The sizes and CRC are known up front, so the local header is written once
+    and never patched.
+    """
+    with zf._lock:
+        _begin_entry(zf, zinfo)
+        zf.fp.write(payload)
+        _end_entry(zf, zinfo)
+
+
+def _stream_deflated_entry(zf: ZipFile, zinfo: ZipInfo, file_path: str):
+    """
+    Deflate a large file straight into the archive in ZIP_COPY_BUFFER_SIZE chunks.
+    The CRC and sizes go in a data descriptor after the data, so the archive is
+    written in one sequential pass; ZipFile.open(..., 'w') would instead seek back
+    and patch the local header on seekable files.
+    """
+    # Same ZIP64 decision as _open_to_write, based on the size from the stat
+    zip64 = zinfo.file_size * 1.05 > ZIP64_LIMIT
+    zinfo.flag_bits |= ZIP_DATA_DESCRIPTOR_FLAG
+    compressor = zlib.compressobj(ZIP_COMPRESS_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+    crc = 0
+    size = 0
+    compress_size = 0
+    with zf._lock:
+        _begin_entry(zf, zinfo, zip64)
+        zf._writing = True
+        try:
+            with open(file_path, 'rb') as src:
+                while chunk := src.read(ZIP_COPY_BUFFER_SIZE):
+                    crc = zlib.crc32(chunk, crc)
+                    size += len(chunk)
+                    data = compressor.compress(chunk)
+                    compress_size += len(data)
+                    zf.fp.write(data)
+            data = compressor.flush()
+            compress_size += len(data)
+            zf.fp.write(data)
+
+            if not zip64 and (size > ZIP64_LIMIT or compress_size > ZIP64_LIMIT):
+                raise RuntimeError(f"{file_path} grew past the ZIP64 limit while being archived")
+            zinfo.CRC = crc
+            zinfo.file_size = size
+            zinfo.compress_size = compress_size
+            zf.fp.write(struct.pack('<LLQQ' if zip64 else '<LLLL', ZIP_DATA_DESCRIPTOR_SIGNATURE,
+                                    crc, compress_size, size))
+            _end_entry(zf, zinfo)
+        finally:
+            zf._writing = False
+
+
 def create_zip(repo_name: str, vs_version: str, version: str) -> Path:
     """
     Create a zip file excluding .git and .github directories.
+    Small files are compressed in parallel, large ones are streamed in chunks;
+    entries are written in walk order in a single pass, without seeking back.
     Returns the filename of the created zip.
     """
     build_dir = Path('build')
     build_dir.mkdir(exist_ok=True)
     zip_filename = build_dir / f'{repo_name}-{vs_version}-{version}.zip'
 
-    with ZipFile(zip_filename, 'w') as zf:
-        for root, dirs, files in os.walk('.'):
-            # Remove .git, .github, and build from dirs to prevent traversal
-            dirs[:] = [d for d in dirs if d not in ['.git', '.github', 'build']]
-
-            for file in files:
-                file_path = Path(root) / file
-
-                # Calculate the archive name with the wrapper directory
-                relative_path = file_path.relative_to('.')
-                archive_name = f'{repo_name}-{version}/{relative_path}'
-
-                zf.write(file_path, arcname=archive_name)
+    # Every archive name shares the same wrapper directory
+    archive_prefix = f'{repo_name}-{version}/'
+
+    entries = []
+    for entry in _iter_files('.'):
+        # Paths from _iter_files('.') all start with './', relative to the repository root
+        archive_name = archive_prefix + entry.path.removeprefix('./')
+
+        # Build the entry from the stat cached on the DirEntry
+        file_stat = entry.stat()
+        zinfo = ZipInfo(archive_name, time.localtime(file_stat.st_mtime)[:6])
+        zinfo.external_attr = (file_stat.st_mode & 0xFFFF) << 16
+        zinfo.file_size = file_stat.st_size
+        zinfo.compress_type = ZIP_DEFLATED
+        entries.append((entry.path, zinfo))
+
+    # zlib releases the GIL while compressing, so threads are enough to use every core
+    workers = os.cpu_count() or 1
+    max_in_flight = 2 * workers
+    with ZipFile(zip_filename, 'w', compression=ZIP_DEFLATED, compresslevel=ZIP_COMPRESS_LEVEL,
+                 allowZip64=True) as zf, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+
+        def write_oldest():
+            zinfo, future = in_flight.popleft()
+            payload, zinfo.CRC, zinfo.file_size = future.result()
+            zinfo.compress_size = len(payload)
+            _write_deflated_entry(zf, zinfo, payload)
+
+        for file_path, zinfo in entries:
+            if zinfo.file_size > ZIP_PARALLEL_MAX_SIZE:
+                # Flush the queued small files first so entries keep walk order,
+                # then stream the large file in chunks rather than holding it in memory
+                while in_flight:
+                    write_oldest()
+                _stream_deflated_entry(zf, zinfo, file_path)
+                continue
+
+            # Cap the queued payloads so memory stays bounded while the writer catches up
+            in_flight.append((zinfo, executor.submit(_deflate_file, file_path)))
+            if len(in_flight) >= max_in_flight:
+                write_oldest()
+
+        while in_flight:
+            write_oldest()
 
     print(f"Created zip file: {zip_filename}")
     return zip_filename
@@ -395,11 +583,11 @@ def main():
     print(f"Current version: {current_version}")
 
     # Step 2: Get commits since the last version
-    commits = get_commits_since_tag(current_version)
-    print(f"Found {len(commits)} new commits\n")
+    commit_count = count_commits_since_tag(current_version)
+    print(f"Found {commit_count} new commits\n")
 
     # Step 3: Determine the new version
-    base_version = determine_new_version(current_version, commits)
+    base_version = determine_new_version(current_version, commit_count)
     if base_version is None:
         print("Cannot determine new version")
         sys.exit(1)